@@ -1,16 +1,17 @@
 """Main runner for the proxy scraper.
 """
+import os
 import sys
 
-from pathlib import Path
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
 
 def main():
     """Run the proxy spider"""
-    env_file = Path(".env")
-    if not env_file.exists():
+    token = sys.argv[1] if len(sys.argv) > 1 else None
+
+    if token is None and not os.path.isfile(".env"):
         print("❌ .env file not found!")
         print("📝 Please create .env file with your PERSONAL_TOKEN")
         print("💡 You can copy .env.example to .env and edit it")
@@ -20,7 +21,7 @@ def main():
 
     process = CrawlerProcess(settings)
 
-    process.crawl("proxy_spider")
+    process.crawl("proxy_spider", token=token)
 
     print("🕷️  Starting proxy scraper...")
     process.start()
@@ -8,8 +8,89 @@ import scrapy
 import time
 
 from dotenv import load_dotenv
+from itertools import islice
+from lxml import etree
+from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 load_dotenv()
+_PERSONAL_TOKEN = os.getenv("PERSONAL_TOKEN")
+
+_CUSTOM_SETTINGS = MappingProxyType(
+    {
+        "ROBOTSTXT_OBEY": False,
+        "CONCURRENT_REQUESTS": 8,
+        "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    },
+)
+
+# Known save_id formats, compiled once and tried in priority order so an
+# explicit save_id always beats the generic "Success" fallback
+_SAVE_ID_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'save_id["\']?\s*:\s*["\']?([^"\'>\s]+)',
+        r"save_id=([^&\s]+)",
+        r'"save_id":\s*"([^"]+)"',
+        r"Success[^a-zA-Z0-9]*([a-zA-Z0-9\-]+)",
+    )
+)
+
+# Protocol tokens found in a table cell are folded into a bitmask that
+# indexes a table of precomputed protocol lists. The lookahead lets tokens
+# overlap (e.g. "HTTPSOCKS5"), matching the old substring checks.
+_PROTO_RE = re.compile(rb"(?=(HTTPS?|SOCKS[45]?))")
+_PROTO_BITS = {b"HTTP": 1, b"HTTPS": 2, b"SOCKS": 4, b"SOCKS4": 8, b"SOCKS5": 16}
+
+
+def _protocols_for_mask(mask: int) -> tuple[str, ...]:
+    """Map a protocol bitmask to its canonical protocol list"""
+    protocols = []
+
+    if mask & _PROTO_BITS[b"HTTPS"]:
+        protocols.extend(["HTTP", "HTTPS"])
+    elif mask & _PROTO_BITS[b"HTTP"]:
+        protocols.append("HTTP")
+
+    if mask & _PROTO_BITS[b"SOCKS5"]:
+        protocols.append("SOCKS5")
+    elif mask & _PROTO_BITS[b"SOCKS4"]:
+        protocols.append("SOCKS4")
+    elif mask & _PROTO_BITS[b"SOCKS"]:
+        protocols.extend(["SOCKS4", "SOCKS5"])
+
+    return tuple(protocols) or ("HTTP",)
+
+
+_PROTO_TABLE = tuple(_protocols_for_mask(mask) for mask in range(32))
+
+
+def _iter_proxy_rows(root):
+    """Lazily yield proxy table rows from the parsed document"""
+    body_rows = (tr for tr in root.iter("tr") if tr.getparent().tag == "tbody")
+    first_row = next(body_rows, None)
+    if first_row is not None:
+        yield first_row
+        yield from body_rows
+        return
+
+    # No <tbody>: skip the header row of each table (comments don't count
+    # as siblings, as with :first-child)
+    for tr in root.iter("tr"):
+        if next(tr.itersiblings(etree.Element, preceding=True), None) is not None:
+            yield tr
+
+
+def _dump_json(obj) -> bytes:
+    """Serialize obj as indented JSON, preferring orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
 
 
 class ProxySpider(scrapy.Spider):
@@ -17,22 +98,12 @@ class ProxySpider(scrapy.Spider):
 
     name = "proxy_spider"
 
-    custom_settings = {
-        "ROBOTSTXT_OBEY": False,
-        "DOWNLOAD_DELAY": 1,
-        "CONCURRENT_REQUESTS": 8,
-        "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "DEFAULT_REQUEST_HEADERS": {
-            "sec-fetch-mode": "navigate",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en",
-        },
-    }
+    custom_settings = _CUSTOM_SETTINGS
 
     def __init__(self, token: str | None = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.personal_token = token or os.getenv("PERSONAL_TOKEN")
+        self.personal_token = token or _PERSONAL_TOKEN
 
         if not self.personal_token:
             raise ValueError(
@@ -42,7 +113,9 @@ class ProxySpider(scrapy.Spider):
 
         self.start_time = time.time()
         self.proxies: list[dict] = []
+        self._endpoints: list[str] = []
         self.results: dict[str, list[str]] = {}
+        self._pending_chunks = 0
 
     def start_requests(self):
         """Start scraping proxies"""
@@ -56,18 +129,18 @@ class ProxySpider(scrapy.Spider):
         """Parse proxies from the website"""
         self.logger.info("Parsing proxies from advanced.name/freeproxy")
 
-        rows = response.css("table tbody tr")
-        if not rows:
-            rows = response.css("table tr:not(:first-child)")
-
-        if not rows:
-            self.logger.error("Could not find proxy table")
-            return
+        rows = islice(_iter_proxy_rows(response.selector.root), 150)
 
-        for i, row in enumerate(rows[:150]):
-            proxy = self._parse_proxy_row(row, i + 1)
+        row_num = 0
+        for row_num, row in enumerate(rows, 1):
+            proxy = self._parse_proxy_row(row, row_num)
             if proxy:
                 self.proxies.append(proxy)
+                self._endpoints.append(f"{proxy['ip']}:{proxy['port']}")
+
+        if not row_num:
+            self.logger.error("Could not find proxy table")
+            return
 
         self.logger.info(f"Successfully parsed {len(self.proxies)} proxies")
 
@@ -78,21 +151,20 @@ class ProxySpider(scrapy.Spider):
     def _parse_proxy_row(self, row, row_num: int) -> dict | None:
         """Parse individual proxy row"""
         try:
-            cells = row.css("td")
+            cells = row.findall("td")
             if len(cells) < 2:
                 return None
 
-            ip = cells[0].css("::text").get()
+            ip = next(cells[0].itertext(), "").strip()
             if not ip:
                 return None
-            ip = ip.strip()
 
-            port_text = cells[1].css("::text").get()
+            port_text = next(cells[1].itertext(), "").strip()
             if not port_text:
                 return None
 
             try:
-                port = int(port_text.strip())
+                port = int(port_text)
             except ValueError:
                 return None
 
@@ -113,31 +185,21 @@ class ProxySpider(scrapy.Spider):
 
     def _extract_protocols(self, protocol_cell) -> list[str]:
         """Extract protocols from table cell"""
-        if not protocol_cell:
+        if protocol_cell is None:
             return ["HTTP"]
 
-        cell_text = protocol_cell.get().upper()
-        protocols = []
+        cell_text = etree.tostring(protocol_cell, method="html", with_tail=False).upper()
 
-        if "HTTPS" in cell_text:
-            protocols.extend(["HTTP", "HTTPS"])
-        elif "HTTP" in cell_text:
-            protocols.append("HTTP")
+        mask = 0
+        for token in _PROTO_RE.findall(cell_text):
+            mask |= _PROTO_BITS[token]
 
-        if "SOCKS5" in cell_text:
-            protocols.append("SOCKS5")
-        elif "SOCKS4" in cell_text:
-            protocols.append("SOCKS4")
-        elif "SOCKS" in cell_text:
-            protocols.extend(["SOCKS4", "SOCKS5"])
-
-        return protocols or ["HTTP"]
+        return list(_PROTO_TABLE[mask])
 
     def _save_proxies(self):
         """Save proxies to JSON file"""
         try:
-            with open("proxies.json", "w") as f:
-                json.dump(self.proxies, f, indent=2)
+            Path("proxies.json").write_bytes(_dump_json(self.proxies))
             self.logger.info(f"Saved {len(self.proxies)} proxies to proxies.json")
         except Exception as e:
             self.logger.error(f"Error saving proxies: {e}")
@@ -158,15 +220,19 @@ class ProxySpider(scrapy.Spider):
         """Submit proxies to the upload form"""
         self.logger.info("Submitting proxies to upload form")
 
-        # Prepare proxy strings
-        proxy_strings = [f"{proxy['ip']}:{proxy['port']}" for proxy in self.proxies]
-
-        # Split into chunks of 50
+        # Collect the preformatted proxy strings into chunks of 50
         chunk_size = 50
-        chunks = [
-            proxy_strings[i : i + chunk_size]
-            for i in range(0, len(proxy_strings), chunk_size)
-        ]
+        chunks: list[list[str]] = []
+        chunk: list[str] = []
+        for endpoint in self._endpoints:
+            chunk.append(endpoint)
+            if len(chunk) == chunk_size:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+
+        self._pending_chunks = len(chunks)
 
         self.logger.info(f"Uploading {len(chunks)} chunks of proxies")
 
@@ -194,25 +260,25 @@ class ProxySpider(scrapy.Spider):
 
         save_id = self._extract_save_id(response.text, chunk_index)
 
-        self.results[save_id] = chunk_proxies
+        if save_id in self.results:
+            self.logger.warning(
+                f"save_id {save_id} repeated for chunk {chunk_index + 1}, "
+                "merging its proxies into the existing entry",
+            )
+
+        # Merge rather than overwrite so a repeated save_id keeps every proxy
+        self.results.setdefault(save_id, []).extend(chunk_proxies)
 
         self.logger.info(f"Chunk {chunk_index + 1} uploaded with save_id: {save_id}")
 
-        expected_chunks = (len(self.proxies) + 49) // 50  # Ceiling division
-        if len(self.results) >= expected_chunks:
+        self._pending_chunks -= 1
+        if self._pending_chunks == 0:
             self._finalize_spider()
 
     def _extract_save_id(self, response_text: str, chunk_index: int) -> str:
         """Extract save_id from upload response"""
-        patterns = [
-            r'save_id["\']?\s*:\s*["\']?([^"\'>\s]+)',
-            r"save_id=([^&\s]+)",
-            r'"save_id":\s*"([^"]+)"',
-            r"Success[^a-zA-Z0-9]*([a-zA-Z0-9\-]+)",
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, response_text, re.IGNORECASE)
+        for pattern in _SAVE_ID_PATTERNS:
+            match = pattern.search(response_text)
             if match:
                 save_id = match.group(1)
                 self.logger.debug(f"Found save_id using pattern: {save_id}")
@@ -225,8 +291,7 @@ class ProxySpider(scrapy.Spider):
     def _finalize_spider(self):
         """Save results and execution time"""
         try:
-            with open("results.json", "w") as f:
-                json.dump(self.results, f, indent=2)
+            Path("results.json").write_bytes(_dump_json(self.results))
             self.logger.info(f"Saved upload results with {len(self.results)} entries")
         except Exception as e:
             self.logger.error(f"Error saving results: {e}")
@@ -246,8 +311,7 @@ class ProxySpider(scrapy.Spider):
             seconds = int(elapsed % 60)
             time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
-            with open("time.txt", "w") as f:
-                f.write(time_str)
+            Path("time.txt").write_bytes(time_str.encode("ascii"))
 
             self.logger.info(f"Execution time: {time_str}")
         except Exception as e:
@@ -0,0 +1,124 @@
+import pytest
+
+from lxml import html as lxml_html
+from scrapy.http import HtmlResponse, Request
+from Spyder_parse.spiders.proxy_spider import ProxySpider
+
+
+@pytest.fixture
+def spider():
+    return ProxySpider(token="test-token")
+
+
+@pytest.mark.parametrize(
+    ("response_text", "expected"),
+    [
+        ('{"status": "success", "save_id": "abc123"}', "abc123"),
+        ('{"success": true, "save_id": "abc123"}', "abc123"),
+        ('<div class="alert-success">Saved</div> /done?save_id=xyz', "xyz"),
+        ("Success! save_id: q1", "q1"),
+        ("Success! id-9", "id-9"),
+    ],
+)
+def test_extract_save_id_prefers_explicit_save_id(spider, response_text, expected):
+    assert spider._extract_save_id(response_text, 0) == expected
+
+
+def test_extract_save_id_falls_back_to_generated_id(spider):
+    assert spider._extract_save_id("nothing here", 2).startswith("upload_")
+
+
+def test_repeated_save_id_is_merged_with_warning(spider, caplog, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    spider._pending_chunks = 2
+    for chunk_index, chunk in enumerate([["1.1.1.1:80"], ["2.2.2.2:81"]]):
+        request = Request(
+            "https://test-rg8.ddns.net",
+            meta={"chunk_index": chunk_index, "chunk_proxies": chunk},
+        )
+        response = HtmlResponse(
+            request.url, body=b'"save_id": "same"', encoding="utf-8", request=request,
+        )
+        spider._parse_upload_response(response)
+
+    assert spider.results == {"same": ["1.1.1.1:80", "2.2.2.2:81"]}
+    assert "save_id same repeated for chunk 2" in caplog.text
+
+
+def _parse(spider, html):
+    response = HtmlResponse(
+        "https://advanced.name/freeproxy", body=html.encode(), encoding="utf-8",
+    )
+    list(spider.parse_proxies(response))
+    return [(proxy["ip"], proxy["port"]) for proxy in spider.proxies]
+
+
+@pytest.fixture
+def parse(spider, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return lambda html: _parse(spider, html)
+
+
+def test_parse_proxies_reads_tbody_rows(parse):
+    html = (
+        "<table><thead><tr><th>IP</th><th>Port</th></tr></thead>"
+        "<tbody><tr><td>1.1.1.1</td><td>80</td></tr>"
+        "<tr><td>2.2.2.2</td><td>81</td></tr></tbody></table>"
+    )
+    assert parse(html) == [("1.1.1.1", 80), ("2.2.2.2", 81)]
+
+
+def test_parse_proxies_skips_header_without_tbody(parse):
+    html = (
+        "<table><tr><td>9.9.9.9</td><td>1</td></tr>"
+        "<tr><td>1.1.1.1</td><td>80</td></tr></table>"
+    )
+    assert parse(html) == [("1.1.1.1", 80)]
+
+
+def test_parse_proxies_ignores_comment_before_header(parse):
+    html = (
+        "<table><!-- c --><tr><td>9.9.9.9</td><td>1</td></tr>"
+        "<tr><td>1.1.1.1</td><td>80</td></tr></table>"
+    )
+    assert parse(html) == [("1.1.1.1", 80)]
+
+
+def test_parse_proxies_caps_at_150_rows(parse):
+    rows = "".join(f"<tr><td>10.0.0.{i % 256}</td><td>{i}</td></tr>" for i in range(200))
+    proxies = parse(f"<table><tbody>{rows}</tbody></table>")
+    assert len(proxies) == 150
+    assert proxies[-1] == ("10.0.0.149", 149)
+
+
+def test_parse_proxies_takes_first_text_of_nested_cell(parse):
+    html = (
+        "<table><tbody><tr><td>1.1.1.1<span>x</span></td>"
+        "<td><b>80</b> open</td></tr></tbody></table>"
+    )
+    assert parse(html) == [("1.1.1.1", 80)]
+
+
+def _cell(markup):
+    return lxml_html.fromstring(f"<table><tr>{markup}</tr></table>").find(".//td")
+
+
+@pytest.mark.parametrize(
+    ("markup", "expected"),
+    [
+        ("<td>HTTPS</td>", ["HTTP", "HTTPS"]),
+        ("<td>http</td>", ["HTTP"]),
+        ("<td>SOCKS4, SOCKS5</td>", ["SOCKS5"]),
+        ("<td>SOCKS4</td>", ["SOCKS4"]),
+        ("<td>SOCKS</td>", ["SOCKS4", "SOCKS5"]),
+        ("<td>HTTPSOCKS5</td>", ["HTTP", "HTTPS", "SOCKS5"]),
+        ("<td><a>HTTPS</a><a>SOCKS4</a></td>", ["HTTP", "HTTPS", "SOCKS4"]),
+        ("<td></td>", ["HTTP"]),
+    ],
+)
+def test_extract_protocols(spider, markup, expected):
+    assert spider._extract_protocols(_cell(markup)) == expected
+
+
+def test_extract_protocols_without_cell(spider):
+    assert spider._extract_protocols(None) == ["HTTP"]